@@ -1,13 +1,20 @@
 import sqlite3
-from datetime import datetime, timedelta
+import time
 import pandas as pd
 
 DB_NAME = "noticias.db"
 
+# Estado de enriquecimiento con IA de cada noticia
+STATUS_PENDING = "pending"   # Guardada con titulo/resumen RSS y sentimiento de respaldo
+STATUS_ENRICHED = "enriched" # Titulo, resumen y sentimiento generados por OpenAI
+
 def init_db():
     conn = sqlite3.connect(DB_NAME)
     c = conn.cursor()
     
+    # WAL permite que el job de enriquecimiento escriba mientras la app lee
+    c.execute('PRAGMA journal_mode=WAL')
+    
     # Crear tabla si no existe
     c.execute('''
         CREATE TABLE IF NOT EXISTS news (
@@ -17,9 +24,32 @@ def init_db():
             section TEXT,
             published_date TIMESTAMP,
             sentiment TEXT,
-            source TEXT
+            source TEXT,
+            enrichment_status TEXT DEFAULT 'pending',
+            published_ts INTEGER
         )
     ''')
+    
+    # Migracion: bases creadas antes de la columna enrichment_status.
+    # No se sabe cuales filas antiguas pasaron por IA, asi que quedan como pendientes.
+    columns = [row[1] for row in c.execute('PRAGMA table_info(news)')]
+    if 'enrichment_status' not in columns:
+        c.execute("ALTER TABLE news ADD COLUMN enrichment_status TEXT DEFAULT 'pending'")
+    c.execute('CREATE INDEX IF NOT EXISTS idx_news_enrichment_status ON news (enrichment_status)')
+    
+    # Migracion: published_ts guarda la fecha como segundos epoch UTC (entero).
+    # Las filas antiguas se guardaron sin zona horaria; se interpretan como UTC.
+    # Corre una sola vez: init_db se llama en cada rerun de Streamlit.
+    if 'published_ts' not in columns:
+        c.execute('ALTER TABLE news ADD COLUMN published_ts INTEGER')
+        c.execute('''
+            UPDATE news SET published_ts = CAST(strftime('%s', published_date) AS INTEGER)
+            WHERE published_ts IS NULL
+        ''')
+        c.execute('SELECT link, published_date FROM news WHERE published_ts IS NULL')
+        for link, published_date in c.fetchall():
+            print(f"Warning: could not migrate published_date {published_date!r} for {link}; it will not be listed.")
+    c.execute('CREATE INDEX IF NOT EXISTS idx_news_published_ts ON news (published_ts)')
     conn.commit()
     conn.close()
 
@@ -37,8 +67,8 @@ def save_news(news_list):
     for item in news_list:
         try:
             c.execute('''
-                INSERT OR IGNORE INTO news (link, title, summary, section, published_date, sentiment, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT OR IGNORE INTO news (link, title, summary, section, published_date, sentiment, source, enrichment_status, published_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 item['link'],
                 item['title'],
@@ -46,7 +76,9 @@ def save_news(news_list):
                 item['section'],
                 item['published_date'],
                 item['sentiment'],
-                item['source']
+                item['source'],
+                item.get('enrichment_status', STATUS_PENDING),
+                item['published_ts']
             ))
         except Exception as e:
             print(f"Error saving news: {e}")
@@ -65,19 +97,58 @@ def url_exists(link):
     conn.close()
     return exists
 
+def get_pending_enrichment(limit=100, after_link=""):
+    """
+    Returns up to 'limit' rows still waiting for AI enrichment, as dicts.
+    Paginated by link so rows that fail again are not re-selected in the same run.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute('''
+        SELECT link, title, summary FROM news
+        WHERE enrichment_status = ? AND link > ?
+        ORDER BY link
+        LIMIT ?
+    ''', (STATUS_PENDING, after_link, limit))
+    rows = [dict(row) for row in c.fetchall()]
+    conn.close()
+    return rows
+
+def save_enrichment(results):
+    """
+    Writes back a batch of enriched rows in a single transaction.
+    'results' is a list of dicts with link, title, summary and sentiment.
+    """
+    if not results:
+        return
+
+    conn = sqlite3.connect(DB_NAME, timeout=30)
+    c = conn.cursor()
+    c.executemany('''
+        UPDATE news
+        SET title = ?, summary = ?, sentiment = ?, enrichment_status = ?
+        WHERE link = ? AND enrichment_status = ?
+    ''', [
+        (r['title'], r['summary'], r['sentiment'], STATUS_ENRICHED, r['link'], STATUS_PENDING)
+        for r in results
+    ])
+    conn.commit()
+    conn.close()
+
 def get_recent_news(hours=168):
     """
     Obtiene noticias de las últimas 'hours' horas, ordenadas por fecha (relevancia implicita en RSS).
     """
     conn = sqlite3.connect(DB_NAME)
     
-    # Calcular fecha límite
-    time_threshold = datetime.now() - timedelta(hours=hours)
+    # Calcular fecha límite (segundos epoch UTC)
+    time_threshold = int(time.time()) - hours * 3600
     
     query = """
         SELECT * FROM news 
-        WHERE published_date >= ?
-        ORDER BY published_date DESC
+        WHERE published_ts >= ?
+        ORDER BY published_ts DESC
     """
     
     df = pd.read_sql_query(query, conn, params=(time_threshold,))
@@ -0,0 +1,160 @@
+"""
+Re-enriches with OpenAI the news stored without AI (raw RSS title and fallback sentiment).
+
+Usage:
+    python enrich_db.py --workers 8 --rate 3 --batch-size 50
+
+Each batch is written back as soon as it finishes, so the job can be stopped
+and re-run at any time: only rows still marked as 'pending' are processed.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+from openai import OpenAI, APIStatusError
+
+from database import init_db, get_pending_enrichment, save_enrichment
+from rss_fetcher import extract_article_content, request_ai_analysis
+
+load_dotenv()
+
+
+class RateLimiter:
+    """
+    Shared between workers: allows at most 'rate' OpenAI calls per second.
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0, slot - now))
+
+    def pause(self, seconds):
+        """
+        Holds back every worker for 'seconds' (e.g. after a 429).
+        """
+        with self.lock:
+            self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+
+def retry_delay(error, attempt):
+    """
+    Seconds to wait before retrying: the Retry-After header on a 429, exponential otherwise.
+    """
+    if isinstance(error, APIStatusError) and error.status_code == 429:
+        try:
+            return float(error.response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    return 2 ** attempt
+
+
+def enrich_row(row, client, limiter, retries=2):
+    """
+    Scrapes and analyzes one row. Returns the enriched dict or None if every attempt failed.
+    The client is built with max_retries=0, so every attempt goes through the limiter.
+    """
+    article_content = extract_article_content(row['link'])
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            title, summary, sentiment = request_ai_analysis(row['title'], row['summary'], article_content, None, client)
+            return {'link': row['link'], 'title': title, 'summary': summary, 'sentiment': sentiment}
+        except Exception as e:
+            print(f"OpenAI Error ({attempt + 1}/{retries + 1}) {row['link']}: {e}")
+            if attempt < retries:
+                delay = retry_delay(e, attempt)
+                if isinstance(e, APIStatusError) and e.status_code == 429:
+                    limiter.pause(delay)
+                time.sleep(delay)
+    return None
+
+
+def pending_rows(batch_size, limit=None):
+    """
+    Yields pending rows page by page, at most 'limit' in total.
+    """
+    last_link = ""  # Checkpoint within the run: failed rows stay pending but are not retried again
+    count = 0
+    while limit is None or count < limit:
+        size = batch_size if limit is None else min(batch_size, limit - count)
+        rows = get_pending_enrichment(size, last_link)
+        if not rows:
+            return
+        yield from rows
+        count += len(rows)
+        last_link = rows[-1]['link']
+
+
+def run(api_key, workers, rate, batch_size, limit=None):
+    client = OpenAI(api_key=api_key, max_retries=0)
+    limiter = RateLimiter(rate)
+    rows = pending_rows(batch_size, limit)
+    in_flight = set()
+    done = []
+    enriched = failed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit_next():
+            row = next(rows, None)
+            if row is not None:
+                in_flight.add(pool.submit(enrich_row, row, client, limiter))
+
+        # Keep a bounded window of rows queued so workers never sit idle
+        for _ in range(workers * 2):
+            submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                in_flight.discard(future)
+                result = future.result()
+                if result:
+                    done.append(result)
+                else:
+                    failed += 1
+                submit_next()
+
+            if len(done) >= batch_size or (not in_flight and done):
+                save_enrichment(done)
+                enriched += len(done)
+                done = []
+                print(f"Enriched {enriched} rows ({failed} failed, left as pending).")
+
+    return enriched, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich with AI the news stored without it.")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument('--rate', type=float, default=3.0, help="Max OpenAI calls per second (default: 3)")
+    parser.add_argument('--batch-size', type=int, default=50, help="Rows written back per batch (default: 50)")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many rows")
+    args = parser.parse_args()
+
+    for name in ('workers', 'rate', 'batch_size', 'limit'):
+        value = getattr(args, name)
+        if value is not None and value <= 0:
+            parser.error(f"--{name.replace('_', '-')} must be greater than 0")
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        parser.error("OPENAI_API_KEY is not set")
+
+    init_db()
+    start = time.time()
+    enriched, failed = run(api_key, args.workers, args.rate, args.batch_size, args.limit)
+    print(f"Done in {time.time() - start:.1f}s: {enriched} enriched, {failed} failed.")
+
+
+if __name__ == "__main__":
+    main()
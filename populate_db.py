@@ -1,6 +1,7 @@
 from rss_fetcher import update_news
-from database import save_news
+from database import init_db, save_news
 
+init_db()
 print("Fetching and saving news...")
 try:
     news = update_news()
@@ -1,8 +1,10 @@
 import feedparser
 from bs4 import BeautifulSoup
 from textblob import TextBlob
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import dateutil.parser
+import calendar
+import time
 import re
 
 # Keywords for simple sentiment analysis (fallback since no heavy ML models)
@@ -38,13 +40,34 @@ def analyze_sentiment(text):
     else:
         return 'yellow'
 
+def parse_entry_timestamp(entry):
+    """
+    Returns the entry's publication date as UTC epoch seconds.
+    Uses feedparser's pre-parsed struct_time (already UTC) and only falls back
+    to dateutil for dates feedparser could not parse.
+    """
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if parsed:
+        return calendar.timegm(parsed)
+
+    if 'published' in entry:
+        try:
+            dt = dateutil.parser.parse(entry.published)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp())
+        except (ValueError, OverflowError):
+            pass
+
+    return int(time.time())
+
 def clean_html(html_content):
     soup = BeautifulSoup(html_content, "html.parser")
     return soup.get_text()
 
 import requests
 from openai import OpenAI
-from database import url_exists
+from database import url_exists, STATUS_PENDING, STATUS_ENRICHED
 
 def extract_article_content(url):
     """
@@ -68,14 +91,14 @@ def extract_article_content(url):
         pass
     return None
 
-def analyze_with_ai(rss_title, rss_summary, article_content, api_key):
+def request_ai_analysis(rss_title, rss_summary, article_content, api_key, client=None):
     """
     Uses OpenAI to generate content. Preference given to article_content.
+    Raises on OpenAI errors, so callers can tell an enriched result apart from the fallback.
+    An existing 'client' can be passed to control its retries (see enrich_db.py).
     """
-    if not api_key:
-        return rss_title, rss_summary, 'yellow'
-
-    client = OpenAI(api_key=api_key)
+    if client is None:
+        client = OpenAI(api_key=api_key)
     
     # Decide what context to use
     context = ""
@@ -101,40 +124,35 @@ def analyze_with_ai(rss_title, rss_summary, article_content, api_key):
     Sentiment: [Red/Yellow/Green]
     """
     
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful news assistant. Always output in Spanish."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=250
-        )
-        content = response.choices[0].message.content
-        
-        # Parse output
-        lines = content.split('\n')
-        new_title = rss_title
-        new_summary = rss_summary
-        sentiment = 'yellow'
-        
-        for line in lines:
-            if line.strip().startswith('Title:'):
-                new_title = line.replace('Title:', '').strip()
-            elif line.strip().startswith('Summary:'):
-                new_summary = line.replace('Summary:', '').strip()
-            elif line.strip().startswith('Sentiment:'):
-                s_text = line.replace('Sentiment:', '').strip().lower()
-                if 'red' in s_text or 'negative' in s_text: sentiment = 'red'
-                elif 'green' in s_text or 'positive' in s_text: sentiment = 'green'
-                else: sentiment = 'yellow'
-                
-        return new_title, new_summary, sentiment
-        
-    except Exception as e:
-        print(f"OpenAI Error: {e}")
-        return rss_title, rss_summary, 'yellow'
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a helpful news assistant. Always output in Spanish."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=250
+    )
+    content = response.choices[0].message.content
+    
+    # Parse output
+    lines = content.split('\n')
+    new_title = rss_title
+    new_summary = rss_summary
+    sentiment = 'yellow'
+    
+    for line in lines:
+        if line.strip().startswith('Title:'):
+            new_title = line.replace('Title:', '').strip()
+        elif line.strip().startswith('Summary:'):
+            new_summary = line.replace('Summary:', '').strip()
+        elif line.strip().startswith('Sentiment:'):
+            s_text = line.replace('Sentiment:', '').strip().lower()
+            if 'red' in s_text or 'negative' in s_text: sentiment = 'red'
+            elif 'green' in s_text or 'positive' in s_text: sentiment = 'green'
+            else: sentiment = 'yellow'
+            
+    return new_title, new_summary, sentiment
 
 def fetch_feed(section, url, api_key=None):
     """
@@ -172,14 +190,9 @@ def fetch_feed(section, url, api_key=None):
         if url_exists(link):
             continue
             
-        # Extraer fecha
-        dt = datetime.now()
-        if 'published' in entry:
-            try:
-                dt_aware = dateutil.parser.parse(entry.published)
-                dt = dt_aware.replace(tzinfo=None)
-            except:
-                pass
+        # Extraer fecha (UTC)
+        published_ts = parse_entry_timestamp(entry)
+        dt = datetime.fromtimestamp(published_ts, timezone.utc).replace(tzinfo=None)
             
         # Basic RSS info
         summary_raw = entry.get('summary', '') or entry.get('description', '')
@@ -192,11 +205,17 @@ def fetch_feed(section, url, api_key=None):
         sentiment = 'yellow'
         new_title = rss_title
         new_summary = rss_summary
+        enrichment_status = STATUS_PENDING
         
         if api_key:
             # Scrape content
             article_content = extract_article_content(link)
-            new_title, new_summary, sentiment = analyze_with_ai(rss_title, rss_summary, article_content, api_key)
+            try:
+                new_title, new_summary, sentiment = request_ai_analysis(rss_title, rss_summary, article_content, api_key)
+                enrichment_status = STATUS_ENRICHED
+            except Exception as e:
+                # Stored as pending so enrich_db.py can retry it later
+                print(f"OpenAI Error: {e}")
         else:
             # Fallback
             full_text = f"{rss_title} {rss_summary}"
@@ -218,8 +237,10 @@ def fetch_feed(section, url, api_key=None):
             'summary': new_summary,
             'section': section,
             'published_date': dt,
+            'published_ts': published_ts,
             'sentiment': sentiment,
-            'source': source_title
+            'source': source_title,
+            'enrichment_status': enrichment_status
         }
         news_items.append(item)
         
@@ -1,5 +1,5 @@
 from rss_fetcher import update_news
-from datetime import datetime
+import time
 
 print("Starting update...")
 news = update_news()
@@ -10,7 +10,7 @@ if news:
     print(news[0]['published_date'])
     
     # Check date range
-    now = datetime.now()
-    deltas = [(now - n['published_date']).total_seconds()/3600 for n in news]
+    now = time.time()
+    deltas = [(now - n['published_ts'])/3600 for n in news]
     print(f"Oldest news (hours ago): {max(deltas):.2f}")
     print(f"Newest news (hours ago): {min(deltas):.2f}")